@@ -1,5 +1,28 @@
 from src.config.logging import logger
+import pyarrow.csv as pacsv
 import pandas as pd
+import pyarrow as pa
+import csv
+
+
+def _read_csv_as_strings(file_path: str) -> pa.Table:
+    """
+    Reads a CSV file into an Arrow table with every column typed as a nullable string,
+    so files whose values would be inferred differently (e.g. dates) still share one schema.
+    
+    Args:
+        file_path (str): Path to the CSV file.
+    
+    Returns:
+        pa.Table: The CSV contents.
+    """
+    with open(file_path, newline='', encoding='utf-8') as file:
+        header = next(csv.reader(file))
+    convert_options = pacsv.ConvertOptions(
+        column_types={column: pa.string() for column in header},
+        strings_can_be_null=True
+    )
+    return pacsv.read_csv(file_path, convert_options=convert_options)
 
 
 def load_and_combine_csv(file_paths: list[str]) -> pd.DataFrame:
@@ -13,8 +36,9 @@ def load_and_combine_csv(file_paths: list[str]) -> pd.DataFrame:
         pd.DataFrame: Combined DataFrame from all CSV files.
     """
     try:
-        dataframes = [pd.read_csv(file) for file in file_paths]
-        combined_df = pd.concat(dataframes, ignore_index=True)
+        # Parse and concatenate as Arrow tables, converting to pandas only once
+        tables = [_read_csv_as_strings(file) for file in file_paths]
+        combined_df = pa.concat_tables(tables, promote_options="default").to_pandas(types_mapper=pd.ArrowDtype)
         logger.info("CSV files loaded and combined successfully.")
         return combined_df
     except Exception as e:
@@ -24,24 +48,31 @@ def load_and_combine_csv(file_paths: list[str]) -> pd.DataFrame:
 
 
 
-def save_dataframe(df: pd.DataFrame, output_path: str) -> None:
+def save_dataframe(df: pd.DataFrame, output_path: str, as_csv: bool = False) -> None:
     """
-    Saves the DataFrame to a CSV file.
+    Saves the DataFrame to a zstd-compressed Parquet file, or to a CSV file if requested.
     
     Args:
         df (pd.DataFrame): The DataFrame to save.
-        output_path (str): The path to save the CSV file.
+        output_path (str): The path to save the file.
+        as_csv (bool): Write CSV instead of Parquet, e.g. for manual labeling.
     """
     try:
-        df.to_csv(output_path, index=False)
+        if as_csv:
+            df.to_csv(output_path, index=False)
+        else:
+            df.to_parquet(output_path, compression='zstd', index=False)
         logger.info(f"DataFrame saved successfully to {output_path}.")
     except Exception as e:
-        logger.error(f"Error saving DataFrame to CSV: {e}")
+        logger.error(f"Error saving DataFrame: {e}")
         raise
 
-def run() -> None:
+def run(as_csv: bool = False) -> None:
     """
     Main function to execute the data processing pipeline.
+
+    Args:
+        as_csv (bool): Write the consolidated results as CSV instead of Parquet.
     """
     file_paths = [
         './data/vais-batch-1-results.csv',
@@ -50,8 +81,8 @@ def run() -> None:
     ]
     try:
         combined_df = load_and_combine_csv(file_paths)
-        output_path = './data/vais_consolidated_results.csv'
-        save_dataframe(combined_df, output_path)
+        output_path = './data/vais_consolidated_results.csv' if as_csv else './data/vais_consolidated_results.parquet'
+        save_dataframe(combined_df, output_path, as_csv=as_csv)
         logger.info("Data processing pipeline completed successfully.")
     except Exception as e:
         logger.error(f"Error in data processing pipeline: {e}")
@@ -1,9 +1,32 @@
 
 from src.config.logging import logger
+from typing import Iterator
+from typing import Iterable
 from typing import List
 from typing import Dict
 import pandas as pd
-import json
+import orjson
+import csv
+
+
+def iter_jsonl(file_path: str, chunk_size: int = 50_000) -> Iterator[List[Dict]]:
+    """
+    Lazily reads a JSONL file, yielding its records in chunks so the whole file is never held in memory.
+    
+    :param file_path: Path to the JSONL file
+    :param chunk_size: Maximum number of records per chunk
+    :return: Iterator over lists of dictionaries
+    """
+    logger.info(f'Streaming JSONL file from {file_path} in chunks of {chunk_size}')
+    chunk = []
+    with open(file_path, 'rb') as file:
+        for line in file:
+            chunk.append(orjson.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
 
 
 def read_jsonl(file_path: str) -> List[Dict]:
@@ -14,10 +37,7 @@ def read_jsonl(file_path: str) -> List[Dict]:
     :return: List of dictionaries with the data
     """
     logger.info(f'Reading JSONL file from {file_path}')
-    data = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            data.append(json.loads(line))
+    data = [row for chunk in iter_jsonl(file_path) for row in chunk]
     logger.info('Finished reading JSONL file')
     return data
 
@@ -61,25 +81,38 @@ def save_to_csv(df: pd.DataFrame, file_path: str) -> str:
     return file_path
 
 
+def write_rows_to_csv(data: Iterable[Dict], file_path: str, columns: List[str]) -> str:
+    """
+    Writes records straight to a CSV file without building a DataFrame, renaming 'link' to 'url'.
+    The rename is done in place, so records that have a 'link' key are modified.
+    
+    :param data: Iterable of dictionaries
+    :param file_path: Path to the output CSV file
+    :param columns: List of columns in the desired order; other keys are dropped
+    :return: Path to the saved CSV file
+    """
+    logger.info(f'Writing rows to CSV file at {file_path}')
+    with open(file_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        for row in data:
+            if 'link' in row:
+                row['url'] = row.pop('link')
+            writer.writerow(row)
+    logger.info('Finished saving CSV file')
+    return file_path
+
+
 def main():
     jsonl_path = './data/vais-batch-2-results.jsonl'
     csv_path = './data/vais-batch-2-results.csv'
     desired_columns = ['query', 'title', 'url', 'snippet', 'creation_date', 'modified_date']
     
-    # Step 1: Read the JSONL file
-    data = read_jsonl(jsonl_path)
-    
-    # Step 2: Convert to DataFrame
-    df = convert_to_dataframe(data)
-    
-    # Step 3: Rename columns as needed
-    df.rename(columns={'link': 'url'}, inplace=True)
-    
-    # Step 4: Reorder columns
-    df = reorder_columns(df, desired_columns)
+    # Step 1: Stream the JSONL file chunk by chunk
+    rows = (row for chunk in iter_jsonl(jsonl_path) for row in chunk)
     
-    # Step 5: Save to CSV
-    save_to_csv(df, csv_path)
+    # Step 2: Write the selected columns to CSV, renaming 'link' to 'url'
+    write_rows_to_csv(rows, csv_path, desired_columns)
 
     logger.info(f'Process completed. CSV saved at {csv_path}')
 
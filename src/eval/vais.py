@@ -1,11 +1,11 @@
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from src.config.logging import logger
 from src.vais.search import get
-from typing import List
-from typing import Dict 
+from pathlib import Path
 import jsonlines
 import csv
-import os 
 
 
 # DATA_STORE_ID = 'vais-serp-evals-cdn_1716473240944'
@@ -19,42 +19,50 @@ def ensure_directory(path: str) -> None:
     Args:
         path (str): The file path where the directory needs to be checked or created.
     """
-    directory = os.path.dirname(path)
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    directory = Path(path).parent
+    if not directory.exists():
+        directory.mkdir(parents=True, exist_ok=True)
         logger.info(f"Directory {directory} created.")
 
 
-def evaluate(input_path: str, output_path: str) -> None:
+def evaluate(input_path: str, output_path: str, max_workers: int = 16) -> None:
     """
     Evaluates the sustainability reports of companies by reading their names and websites from a CSV,
-    constructing a search query for each, fetching the search results, and writing the results to a JSON lines file.
+    constructing a search query for each, fetching the search results concurrently, and writing the results to a JSON lines file.
 
     Args:
         input_path (str): The path to the input CSV file with columns 'company_name' and 'url'.
         output_path (str): The path to the output JSON lines file where search results will be stored.
+        max_workers (int): The number of queries fetched in parallel.
     """
     logger.info("Starting the evaluation process.")
     ensure_directory(output_path)  # Ensure the output directory exists
     
-    results: List[Dict] = []
     try:
         with open(input_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                company_name = row['company_name'].strip()
-                url = row['url'].strip()
-                search_query = f"{company_name} Sustainability Report 2023 filetype:pdf site:{url}"
+            reader = csv.reader(csvfile)
+            header = next(reader)
+            name_index = header.index('company_name')
+            url_index = header.index('url')
+            queries = [f"{row[name_index].strip()} Sustainability Report 2023 filetype:pdf site:{row[url_index].strip()}" for row in reader if row]
+
+        with jsonlines.open(output_path, mode='w', flush=True) as writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for search_query in queries:
                 logger.info(f'Searching with Query: {search_query}')
-                logger.debug(f"Constructed search query: {search_query}")
-                
-                search_results = get(search_query, DATA_STORE_ID)
+                futures[executor.submit(get, search_query, DATA_STORE_ID)] = search_query
+
+            # Write each query's results as soon as its request completes
+            for future in as_completed(futures):
+                search_query = futures[future]
+                try:
+                    search_results = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch search results for query '{search_query}': {str(e)}")
+                    continue
                 for result in search_results:
                     result['query'] = search_query
-                    results.append(result)
-        
-        with jsonlines.open(output_path, mode='w') as writer:
-            writer.write_all(results)
+                    writer.write(result)
         logger.info(f"Results successfully written to {output_path}")
     except Exception as e:
         logger.error(f"An error occurred during the evaluation process: {str(e)}")
@@ -1,12 +1,135 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Iterator, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from src.config.logging import logger
+from urllib3.util import Retry
+from types import MappingProxyType
+from datetime import timedelta
+import threading
 import requests
+import tempfile
+import hashlib
+import asyncio
+import orjson
+import httpx
+import json
 import yaml
+import time
+import os
+
+# Prefer the libyaml-backed C loader; it is only available when PyYAML was built against libyaml
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+SERPHOUSE_URL = "https://api.serphouse.com/serp/live"
+API_KEY_PATH = './credentials/keys.yaml'
+
+# On-disk cache of SerpHouse responses, so re-running an evaluation does not re-query (and re-bill) the API
+RESPONSE_CACHE_DIR = './.cache/serphouse'
+RESPONSE_CACHE_TTL = timedelta(days=7)
+
+# Seconds; connect is just above the 3s TCP retransmission window, read bounds a stalled response
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 27
+
+# Fixed parts of every SerpHouse request; only the query and the API key vary
+_SEARCH_PARAMS = MappingProxyType({
+    "domain": "google.com",
+    "lang": "en",
+    "device": "desktop",
+    "serp_type": "web",
+    "loc": "United States",
+    "verbatim": "0",
+    "gfilter": "0",
+    "page": "1",
+    "num_result": "10"
+})
+# Request body serialized once with a placeholder query; "q" comes first, so the first match is always the query slot
+_QUERY_PLACEHOLDER = orjson.dumps("\x00Q\x00")
+_PAYLOAD_TEMPLATE = orjson.dumps({"data": {"q": "\x00Q\x00", **_SEARCH_PARAMS}})
+_BASE_HEADERS = MappingProxyType({
+    'accept': "application/json",
+    'content-type': "application/json"
+})
+# requests already advertises gzip/deflate/br (br when brotli is installed); httpx gets the encodings it can decode
+_ASYNC_ACCEPT_ENCODING = "gzip, br"
+
+# Parsed API keys by file path, stored with the (st_mtime_ns, st_size) they were read at
+_API_KEY_CACHE: Dict[str, Tuple[int, int, str]] = {}
+_API_KEY_CACHE_LOCK = threading.Lock()
+
+
+def _read_api_key_cache(cache_path: str, source_stat: os.stat_result) -> Optional[str]:
+    """
+    Read the API key from the JSON cache if it was written for the current version of the YAML file.
+
+    Parameters:
+        cache_path (str): The path to the JSON cache file.
+        source_stat (os.stat_result): The stat result of the YAML file.
+
+    Returns:
+        Optional[str]: The cached API key, or None if the cache is missing, malformed, or stale.
+    """
+    try:
+        with open(cache_path, 'r') as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    # A hand-edited or otherwise malformed cache only means the YAML is read again
+    if not isinstance(cached, dict):
+        return None
+    if cached.get('src_mtime_ns') != source_stat.st_mtime_ns or cached.get('src_size') != source_stat.st_size:
+        return None
+    return cached.get('key')
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """
+    Write bytes to a file via a temporary file in the same directory and os.replace, so readers never see a partial file.
+    The file is created readable by the owner only.
+
+    Parameters:
+        path (str): The destination path.
+        data (bytes): The content to write.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_api_key_cache(cache_path: str, source_stat: os.stat_result, api_key: str) -> None:
+    """
+    Atomically write the API key to the JSON cache. Failures are logged and otherwise ignored.
+
+    Parameters:
+        cache_path (str): The path to the JSON cache file.
+        source_stat (os.stat_result): The stat result of the YAML file the key was read from.
+        api_key (str): The API key.
+    """
+    cached = {'key': api_key, 'src_mtime_ns': source_stat.st_mtime_ns, 'src_size': source_stat.st_size}
+    try:
+        _atomic_write(cache_path, json.dumps(cached).encode('utf-8'))
+    except OSError as e:
+        logger.warning("Could not write API key cache: %s", e)
 
 
 def load_api_key(file_path: str) -> Optional[str]:
     """
-    Load the API key from a YAML file.
+    Load the API key from a YAML file. The parsed key is cached in memory and in a
+    sibling '<file>.cache.json', and the YAML is only re-read when the file's
+    modification time or size changes.
 
     Parameters:
         file_path (str): The path to the YAML file containing the API key.
@@ -15,90 +138,401 @@ def load_api_key(file_path: str) -> Optional[str]:
         Optional[str]: The API key if found, otherwise None.
     """
     try:
-        with open(file_path, 'r') as file:
-            config = yaml.safe_load(file)
+        stat = os.stat(file_path)
+        with _API_KEY_CACHE_LOCK:
+            cached = _API_KEY_CACHE.get(file_path)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return cached[2]
+            cache_path = file_path + '.cache.json'
+            api_key = _read_api_key_cache(cache_path, stat)
+            if api_key is None:
+                with open(file_path, 'r') as file:
+                    config = yaml.load(file, Loader=_YamlLoader)
+                api_key = config['serphouse']['key']
+                _write_api_key_cache(cache_path, stat, api_key)
+            _API_KEY_CACHE[file_path] = (stat.st_mtime_ns, stat.st_size, api_key)
             logger.info("API key loaded successfully.")
-            return config['serphouse']['key']
+            return api_key
     except Exception as e:
-        logger.error(f"Error loading API key: {e}")
+        logger.error("Error loading API key: %s", e)
         return None
 
 
-def fetch_search_results(query: str) -> Dict[str, Any]:
+def _build_headers(api_key: str) -> Dict[str, str]:
     """
-    Fetch search results from the SerpHouse API for a given query.
+    Build the SerpHouse request headers.
+
+    Parameters:
+        api_key (str): The SerpHouse API key.
+
+    Returns:
+        Dict[str, str]: The request headers.
+    """
+    return {**_BASE_HEADERS, 'authorization': f"Bearer {api_key}"}
+
+
+def _build_body(query: str) -> bytes:
+    """
+    Build the serialized SerpHouse request body for a query.
 
     Parameters:
         query (str): The search query.
 
+    Returns:
+        bytes: The JSON request body.
+    """
+    return _PAYLOAD_TEMPLATE.replace(_QUERY_PLACEHOLDER, orjson.dumps(query), 1)
+
+
+def _organic_results(response: Any) -> Optional[List[Any]]:
+    """
+    Return the organic results list of a SerpHouse response.
+
+    Parameters:
+        response (Any): The parsed JSON response from the API.
+
+    Returns:
+        Optional[List[Any]]: The list at results.results.organic, or None if any level is missing or of the wrong type.
+    """
+    node = response
+    for key in ('results', 'results', 'organic'):
+        node = node.get(key) if isinstance(node, dict) else None
+    return node if isinstance(node, list) else None
+
+
+def _is_cacheable(response: Any) -> bool:
+    """
+    Check whether a SerpHouse response is a successful search worth caching.
+
+    Parameters:
+        response (Any): The parsed JSON response from the API.
+
+    Returns:
+        bool: True if the response has an organic results list and no status other than 'success'.
+    """
+    return _organic_results(response) is not None and response.get('status', 'success') == 'success'
+
+
+class SerpHouseClient:
+    """
+    Client for the SerpHouse live SERP API. The API key and request headers are set up
+    once per client, and a pooled session keeps connections alive across searches.
+    """
+
+    def __init__(self, key_path: str = API_KEY_PATH, cache_dir: Optional[str] = RESPONSE_CACHE_DIR,
+                 cache_ttl: timedelta = RESPONSE_CACHE_TTL):
+        """
+        Initialize the client.
+
+        Parameters:
+            key_path (str): The path to the YAML file containing the API key.
+            cache_dir (Optional[str]): Directory for cached responses, or None to disable the cache.
+            cache_ttl (timedelta): How long a cached response is reused.
+
+        Raises:
+            ValueError: If the API key cannot be loaded.
+        """
+        api_key = load_api_key(key_path)
+        if not api_key:
+            raise ValueError("API key is missing.")
+
+        self._cache_dir = cache_dir
+        self._cache_ttl = cache_ttl.total_seconds()
+
+        self._session = requests.Session()
+        # This policy is the only retry layer for SerpHouse calls; callers should not wrap them in further retries.
+        # POST is not retried by urllib3 by default; SerpHouse searches are safe to repeat.
+        # Back-off before the retries is 0s, 1s, 2s, 4s, 8s (urllib3 does not sleep before the first) unless the server sends Retry-After.
+        retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True
+        )
+        self._session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries))
+        self._session.headers.update(_build_headers(api_key))
+
+    def _response_cache_path(self, body: bytes) -> str:
+        """
+        Return the cache file path for a request body.
+
+        Parameters:
+            body (bytes): The serialized request body.
+
+        Returns:
+            str: The path of the cached response file.
+        """
+        return os.path.join(self._cache_dir, hashlib.sha256(body).hexdigest() + '.json')
+
+    def _read_cached_response(self, body: bytes) -> Optional[bytes]:
+        """
+        Return the cached response body for a request body, if present and not expired.
+
+        Parameters:
+            body (bytes): The serialized request body.
+
+        Returns:
+            Optional[bytes]: The cached response body, or None on a cache miss.
+        """
+        if self._cache_dir is None:
+            return None
+        cache_path = self._response_cache_path(body)
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self._cache_ttl:
+                return None
+            with open(cache_path, 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write_cached_response(self, body: bytes, content: bytes) -> None:
+        """
+        Store a response body in the cache. Failures are logged and otherwise ignored.
+
+        Parameters:
+            body (bytes): The serialized request body.
+            content (bytes): The response body.
+        """
+        if self._cache_dir is None:
+            return
+        cache_path = self._response_cache_path(body)
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            _atomic_write(cache_path, content)
+        except OSError as e:
+            logger.warning("Could not write SerpHouse response cache: %s", e)
+
+    def search(self, query: str, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Fetch search results from the SerpHouse API for a given query. Responses are cached on disk,
+        keyed by the SHA-256 of the request body, and reused until the cache TTL expires.
+
+        Parameters:
+            query (str): The search query.
+            force_refresh (bool): Ignore any cached response and query the API.
+
+        Returns:
+            Dict[str, Any]: The JSON response from the API.
+
+        Raises:
+            Exception: If the API call fails or returns an unexpected response.
+        """
+        body = _build_body(query)
+        if not force_refresh:
+            cached = self._read_cached_response(body)
+            if cached is not None:
+                try:
+                    results = orjson.loads(cached)
+                    logger.info("Search results loaded from cache.")
+                    if _organic_results(results) is None:
+                        logger.warning("Cached response for query '%s' has no organic results", query)
+                    return results
+                except orjson.JSONDecodeError:
+                    logger.warning("Ignoring unreadable cached response for query '%s'", query)
+
+        try:
+            # Stream so the body is only downloaded once the status says we will parse it
+            response = self._session.post(SERPHOUSE_URL, data=body, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True)
+            if response.status_code >= 400:
+                response.close()
+                raise requests.HTTPError(f"{response.status_code} {response.reason} from SerpHouse", response=response)
+            logger.info("Search results fetched successfully.")
+            content = response.content
+        except requests.RequestException as e:
+            logger.error("Failed to fetch search results: %s", e)
+            raise
+
+        results = orjson.loads(content)
+        # Error payloads and responses without an organic list come back as 200 too; do not replay them from the cache
+        if _is_cacheable(results):
+            self._write_cached_response(body, content)
+        else:
+            logger.warning("Response for query '%s' is not a successful search (status: %s); not caching it",
+                           query, results.get('status') if isinstance(results, dict) else None)
+        return results
+
+
+_DEFAULT_CLIENT: Optional[SerpHouseClient] = None
+_DEFAULT_CLIENT_LOCK = threading.Lock()
+
+
+def _get_default_client() -> SerpHouseClient:
+    """
+    Return the shared SerpHouseClient, creating it on first use.
+
+    Returns:
+        SerpHouseClient: The module-level default client.
+    """
+    global _DEFAULT_CLIENT
+    with _DEFAULT_CLIENT_LOCK:
+        if _DEFAULT_CLIENT is None:
+            _DEFAULT_CLIENT = SerpHouseClient()
+        return _DEFAULT_CLIENT
+
+
+def fetch_search_results(query: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """
+    Fetch search results from the SerpHouse API for a given query using the default client.
+
+    Parameters:
+        query (str): The search query.
+        force_refresh (bool): Ignore any cached response and query the API.
+
     Returns:
         Dict[str, Any]: The JSON response from the API.
 
     Raises:
         Exception: If the API call fails or returns an unexpected response.
     """
-    url = "https://api.serphouse.com/serp/live"
-    payload = {
-        "data": {
-            "q": query,
-            "domain": "google.com",
-            "lang": "en",
-            "device": "desktop",
-            "serp_type": "web",
-            "loc": "United States",
-            "verbatim": "0",
-            "gfilter": "0",
-            "page": "1",
-            "num_result": "10"
-        }
-    }
-    api_key = load_api_key('./credentials/keys.yaml')
+    return _get_default_client().search(query, force_refresh=force_refresh)
+
+
+def _fetch_search_results_or_none(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch search results for a query, logging and returning None on failure.
+
+    Parameters:
+        query (str): The search query.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if the call failed.
+    """
+    try:
+        return fetch_search_results(query)
+    except Exception as e:
+        logger.error("Failed to fetch search results for query '%s': %s", query, e)
+        return None
+
+
+def fetch_search_results_batch(queries: List[str], max_workers: int = 8) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetch search results for several queries concurrently, sharing the default client's connection pool.
+    A failing query does not abort the batch.
+
+    Parameters:
+        queries (List[str]): The search queries.
+        max_workers (int): The number of queries fetched in parallel.
+
+    Returns:
+        List[Optional[Dict[str, Any]]]: The JSON responses in query order, with None for queries that failed.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_fetch_search_results_or_none, queries))
+
+
+def create_async_client(key_path: str = API_KEY_PATH) -> httpx.AsyncClient:
+    """
+    Create an HTTP/2 async client for the SerpHouse API, so concurrent searches are multiplexed over one connection.
+
+    Parameters:
+        key_path (str): The path to the YAML file containing the API key.
+
+    Returns:
+        httpx.AsyncClient: The configured client; use it as an async context manager.
 
+    Raises:
+        ValueError: If the API key cannot be loaded.
+    """
+    api_key = load_api_key(key_path)
     if not api_key:
         raise ValueError("API key is missing.")
+    headers = {**_build_headers(api_key), 'accept-encoding': _ASYNC_ACCEPT_ENCODING}
+    return httpx.AsyncClient(http2=True, headers=headers, timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT))
 
-    headers = {
-        'accept': "application/json",
-        'content-type': "application/json",
-        'authorization': f"Bearer {api_key}"
-    }
 
+async def fetch_search_results_async(query: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Fetch search results from the SerpHouse API for a given query without blocking the event loop.
+
+    Parameters:
+        query (str): The search query.
+        client (httpx.AsyncClient): A client from create_async_client.
+
+    Returns:
+        Dict[str, Any]: The JSON response from the API.
+
+    Raises:
+        Exception: If the API call fails or returns an unexpected response.
+    """
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()  # Raises an HTTPError for bad responses
+        response = await client.post(SERPHOUSE_URL, content=_build_body(query))
+        response.raise_for_status()
         logger.info("Search results fetched successfully.")
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch search results: {e}")
+        return orjson.loads(response.content)
+    except httpx.HTTPError as e:
+        logger.error("Failed to fetch search results: %s", e)
         raise
 
 
-def get(query: str) -> List[Dict[str, str]]:
+async def fetch_search_results_bulk(queries: List[str], max_concurrency: int = 16) -> List[Optional[Dict[str, Any]]]:
     """
-    Process the search results and extract title, snippet, and link.
+    Fetch search results for many queries concurrently over a single HTTP/2 client.
+    A failing query does not abort the batch.
+
+    Parameters:
+        queries (List[str]): The search queries.
+        max_concurrency (int): The maximum number of requests in flight.
+
+    Returns:
+        List[Optional[Dict[str, Any]]]: The JSON responses in query order, with None for queries that failed.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(query: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await fetch_search_results_async(query, client)
+            except Exception as e:
+                logger.error("Failed to fetch search results for query '%s': %s", query, e)
+                return None
+
+    async with create_async_client() as client:
+        return await asyncio.gather(*(fetch(query, client) for query in queries))
+
+
+class SearchResult(NamedTuple):
+    """A single organic SerpHouse result."""
+    title: str
+    snippet: str
+    link: str
+
+
+def iter_results(response: Dict[str, Any]) -> Iterator[SearchResult]:
+    """
+    Lazily extract the title, snippet, and link of each organic result in a SerpHouse response.
 
     Parameters:
         response (Dict[str, Any]): The JSON response from the API.
 
+    Returns:
+        Iterator[SearchResult]: The organic results, with 'NA' for a missing title or snippet and '' for a missing link.
+    """
+    # A response without organic results (e.g. no matches, or null/list placeholders) yields nothing instead of raising
+    organic = _organic_results(response) or []
+    for item in organic:
+        if not isinstance(item, dict):
+            continue
+        yield SearchResult(item.get('title', 'NA'), item.get('snippet', 'NA'), item.get('link', ''))
+
+
+def get(query: str) -> List[Dict[str, str]]:
+    """
+    Fetch the search results for a query and extract title, snippet, and link.
+
+    Parameters:
+        query (str): The search query.
+
     Returns:
         List[Dict[str, str]]: A list of dictionaries containing title, snippet, and link.
     """
-    try:
-        response = fetch_search_results(query)
-        results = response['results']['results']['organic']
-        processed_results = []
-        for item in results:
-            result = {
-                'title': item.get('title', 'NA'),
-                'snippet': item.get('snippet', 'NA'),
-                'link': item['link']
-            }
-            processed_results.append(result)
-        logger.info("Search results processed successfully.")
-        return processed_results
-    except KeyError as e:
-        logger.error(f"Error processing results: {e}")
-        raise
+    response = fetch_search_results(query)
+    processed_results = [
+        {'title': title, 'snippet': snippet, 'link': link}
+        for title, snippet, link in iter_results(response)
+    ]
+    logger.info("Search results processed successfully.")
+    return processed_results
 
 
 
@@ -1,17 +1,38 @@
 from google.cloud import discoveryengine_v1beta as discoveryengine
 from google.api_core.client_options import ClientOptions
-from google.protobuf import json_format
 from src.config.logging import logger 
 from src.config.setup import config
+from functools import lru_cache
 from datetime import timedelta
 from datetime import datetime
 from typing import Optional
 from typing import List
 from typing import Dict 
+import threading
+import re
 
 
 LOCATION = "global" 
 
+# Seconds to wait for a search response before giving up on the query
+SEARCH_TIMEOUT = 30.0
+
+# Request specs are identical for every query, so build them once
+CONTENT_SEARCH_SPEC = discoveryengine.SearchRequest.ContentSearchSpec(
+    snippet_spec=discoveryengine.SearchRequest.ContentSearchSpec.SnippetSpec(
+        return_snippet=True
+    )
+)
+QUERY_EXPANSION_SPEC = discoveryengine.SearchRequest.QueryExpansionSpec(
+    condition=discoveryengine.SearchRequest.QueryExpansionSpec.Condition.AUTO,
+)
+SPELL_CORRECTION_SPEC = discoveryengine.SearchRequest.SpellCorrectionSpec(
+    mode=discoveryengine.SearchRequest.SpellCorrectionSpec.Mode.AUTO
+)
+
+# PDF date strings: 'D:' followed by YYYYMMDDHHMMSS and an optional timezone suffix
+_PDF_DATE_RE = re.compile(r"D:(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})")
+
 
 def convert_to_human_readable_date(date_str: str) -> str:
     """
@@ -30,9 +51,14 @@ def convert_to_human_readable_date(date_str: str) -> str:
     try:
         # Handle format 'D:YYYYMMDDHHMMSS-XX'00'', 'D:YYYYMMDDHHMMSSZ', 'D:YYYYMMDDHHMMSS'
         if date_str.startswith("D:"):
+            match = _PDF_DATE_RE.match(date_str)
             date_str = date_str[2:]
+            if match is None:
+                logger.warn(f"Invalid datetime part in date string '{date_str}'")
+                return ""
             try:
-                dt = datetime.strptime(date_str[:14], "%Y%m%d%H%M%S")
+                # Build the datetime from the matched digit groups rather than re-parsing a format with strptime
+                dt = datetime(*map(int, match.groups()))
             except ValueError:
                 logger.warn(f"Invalid datetime part in date string '{date_str}'")
                 return ""
@@ -72,6 +98,62 @@ def convert_to_human_readable_date(date_str: str) -> str:
 
 
 
+def convert_dates_to_human_readable(date_strs: List[Optional[str]]) -> List[str]:
+    """
+    Convert a batch of date strings to the human-readable format 'YYYY-MM-DD', parsing each distinct value only once.
+    
+    Args:
+        date_strs (List[Optional[str]]): The date strings to convert.
+        
+    Returns:
+        List[str]: The human-readable date strings, in the same order as the input.
+    """
+    # Creation and modification dates are frequently identical, so convert unique values only
+    converted = {date_str: convert_to_human_readable_date(date_str) for date_str in dict.fromkeys(date_strs)}
+    return [converted[date_str] for date_str in date_strs]
+
+
+
+# Search clients by API endpoint; the lock keeps concurrent first calls from each building a client
+_CLIENTS: Dict[Optional[str], discoveryengine.SearchServiceClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_client(api_endpoint: Optional[str]) -> discoveryengine.SearchServiceClient:
+    """
+    Returns a Discovery Engine search client for the given endpoint, creating it on first use.
+    The client is shared across queries so its gRPC channel and credentials are set up only once.
+    Args:
+        api_endpoint (Optional[str]): Regional API endpoint, or None for the global endpoint.
+    Returns:
+        discoveryengine.SearchServiceClient: The cached search client.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_endpoint)
+        if client is None:
+            client_options = ClientOptions(api_endpoint=api_endpoint) if api_endpoint else None
+            client = discoveryengine.SearchServiceClient(client_options=client_options)
+            _CLIENTS[api_endpoint] = client
+        return client
+
+
+@lru_cache(maxsize=32)
+def _get_serving_config(data_store_id: str) -> str:
+    """
+    Returns the default serving config resource path for a data store.
+    Args:
+        data_store_id (str): Unique identifier of the data store.
+    Returns:
+        str: The serving config resource path.
+    """
+    return discoveryengine.SearchServiceClient.serving_config_path(
+        project=config.PROJECT_ID,
+        location=LOCATION,
+        data_store=data_store_id,
+        serving_config="default_config",
+    )
+
+
 def search_data_store(search_query: str, data_store_id: str) -> Optional[discoveryengine.SearchResponse]:
     """
     Search the data store using Google Cloud's Discovery Engine API.
@@ -81,41 +163,22 @@ def search_data_store(search_query: str, data_store_id: str) -> Optional[discove
         Optional[discoveryengine.SearchResponse]: The search response from the Discovery Engine API.
     """
     try:
-        client_options = (
-            ClientOptions(api_endpoint=f"{LOCATION}-discoveryengine.googleapis.com")
+        client = _get_client(
+            f"{LOCATION}-discoveryengine.googleapis.com"
             if LOCATION != "global"
             else None
         )
 
-        client = discoveryengine.SearchServiceClient(client_options=client_options)
-
-        serving_config = client.serving_config_path(
-            project=config.PROJECT_ID,
-            location=LOCATION,
-            data_store=data_store_id,
-            serving_config="default_config",
-        )
-
-        content_search_spec = discoveryengine.SearchRequest.ContentSearchSpec(
-            snippet_spec=discoveryengine.SearchRequest.ContentSearchSpec.SnippetSpec(
-                return_snippet=True
-            )
-        )
-
         request = discoveryengine.SearchRequest(
-            serving_config=serving_config,
+            serving_config=_get_serving_config(data_store_id),
             query=search_query,
             page_size=10,
-            content_search_spec=content_search_spec,
-            query_expansion_spec=discoveryengine.SearchRequest.QueryExpansionSpec(
-                condition=discoveryengine.SearchRequest.QueryExpansionSpec.Condition.AUTO,
-            ),
-            spell_correction_spec=discoveryengine.SearchRequest.SpellCorrectionSpec(
-                mode=discoveryengine.SearchRequest.SpellCorrectionSpec.Mode.AUTO
-            ),
+            content_search_spec=CONTENT_SEARCH_SPEC,
+            query_expansion_spec=QUERY_EXPANSION_SPEC,
+            spell_correction_spec=SPELL_CORRECTION_SPEC,
         )
 
-        response = client.search(request)
+        response = client.search(request, timeout=SEARCH_TIMEOUT)
         return response
 
     except Exception as e:
@@ -123,6 +186,21 @@ def search_data_store(search_query: str, data_store_id: str) -> Optional[discove
         return None
 
 
+def _get_string_field(fields, key: str) -> Optional[str]:
+    """
+    Reads a string value from the fields of a protobuf Struct.
+    Args:
+        fields: The `fields` map of a google.protobuf.Struct.
+        key (str): The field name to read.
+    Returns:
+        Optional[str]: The string value, or None if the field is not present.
+    """
+    # Membership check first: indexing a protobuf map inserts missing keys
+    if key not in fields:
+        return None
+    return fields[key].string_value
+
+
 def extract_relevant_data(response: Optional[discoveryengine.SearchResponse]) -> List[Dict[str, str]]:
     """
     Extracts title, snippet, link, creation and modified dates from the search response.
@@ -137,6 +215,10 @@ def extract_relevant_data(response: Optional[discoveryengine.SearchResponse]) ->
         logger.error("No response received to extract data.")
         return extracted_data
 
+    # Records with pagemap metatags, and their raw (creationdate, moddate) pairs flattened in the same order
+    dated_records: List[Dict[str, str]] = []
+    raw_dates: List[Optional[str]] = []
+
     for result in response.results:
         data = {
             "title": "",
@@ -146,41 +228,44 @@ def extract_relevant_data(response: Optional[discoveryengine.SearchResponse]) ->
             "modified_date": ""
         }
 
-        # Convert protocol buffer message to JSON
-        result_json = json_format.MessageToDict(result.document._pb)
-
-        # Extracting fields from JSON
-        # struct_data = result_json.get('structData', {})
-        derived_struct_data = result_json.get('derivedStructData', {})
+        # Read the derived struct fields straight from the protobuf instead of converting the whole document to a dict
+        derived_struct_data = result.document._pb.derived_struct_data.fields
 
         # Extracting title
-        title = derived_struct_data.get("title")
+        title = _get_string_field(derived_struct_data, "title")
         if title:
             data["title"] = title
 
         # Extracting snippet
-        snippets = derived_struct_data.get("snippets")
-        if snippets:
-            data["snippet"] = snippets[0]['snippet']
+        if "snippets" in derived_struct_data:
+            snippets = derived_struct_data["snippets"].list_value.values
+            if snippets:
+                data["snippet"] = _get_string_field(snippets[0].struct_value.fields, "snippet") or ""
 
         # Extracting link
-        link = derived_struct_data.get("link")
+        link = _get_string_field(derived_struct_data, "link")
         if link:
             data["link"] = link
 
         # Extracting creation and modification date
-        pagemap = derived_struct_data.get("pagemap", None)
-        if pagemap:
-            metatags = pagemap.get('metatags', None)
-            if metatags:
-                creationdate = metatags[0].get('creationdate', None)
-                moddate = metatags[0].get('moddate', None)
-            
-                data["creation_date"] = convert_to_human_readable_date(creationdate)
-                data["modified_date"] = convert_to_human_readable_date(moddate)
+        if "pagemap" in derived_struct_data:
+            pagemap = derived_struct_data["pagemap"].struct_value.fields
+            if "metatags" in pagemap:
+                metatags = pagemap["metatags"].list_value.values
+                if metatags:
+                    tags = metatags[0].struct_value.fields
+                    dated_records.append(data)
+                    raw_dates.append(_get_string_field(tags, "creationdate"))
+                    raw_dates.append(_get_string_field(tags, "moddate"))
 
         extracted_data.append(data)
 
+    # Convert the collected creation/modification dates in a single pass
+    dates = convert_dates_to_human_readable(raw_dates)
+    for data, creation_date, modified_date in zip(dated_records, dates[::2], dates[1::2]):
+        data["creation_date"] = creation_date
+        data["modified_date"] = modified_date
+
     return extracted_data
 
 